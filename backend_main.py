@@ -2,7 +2,7 @@ import os
 import shutil
 import tempfile
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 from fastapi import FastAPI, UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
@@ -41,16 +41,23 @@ async def process(
     ann_k: int = Form(20),
     cosine_threshold: float = Form(0.9),
     fuzzy_threshold: int = Form(90),
+    vector_store: str = Form("annoy"),
+    nprobe: int = Form(8),
+    rescore_factor: int = Form(4),
+    pq_subvectors: int = Form(16),
+    arrow_strings: bool = Form(False),
 ):
     # --- LAZY IMPORTS (Load only when needed) ---
     from undupify.ingest import read_any, prepare_ingestion, write_ingested
-    from undupify.preprocess import normalize_dataframe
-    from undupify.dedup_exact import exact_deduplicate
-    from undupify.embed import compute_embeddings, build_annoy_index
-    from undupify.dedup_near import find_near_duplicates
+    from undupify.pipeline import InvalidOptionError, run_deduplication, validate_options
     from undupify.reporting import write_report
     # --------------------------------------------
 
+    try:
+        validate_options(vector_store, nprobe, rescore_factor, pq_subvectors)
+    except InvalidOptionError as e:
+        return JSONResponse(status_code=400, content={'error': str(e)})
+
     # Prepare workspace
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     artifacts_dir = os.path.abspath(os.path.join('artifacts', timestamp))
@@ -61,53 +68,144 @@ async def process(
     with open(upload_path, 'wb') as out:
         shutil.copyfileobj(file.file, out)
 
-    df = read_any(upload_path)
-    ingested, selected_col = prepare_ingestion(df, text_column)
+    string_storage = 'pyarrow' if arrow_strings else None
+    df = read_any(upload_path, string_storage)
+    ingested, selected_col = prepare_ingestion(df, text_column, string_storage)
     ingested_path = os.path.join(artifacts_dir, f'ingested_{timestamp}.csv')
     write_ingested(ingested, ingested_path)
 
-    norm_df = normalize_dataframe(ingested, text_col='_text', output_col='_norm', remove_stopwords=remove_stopwords)
-    normalized_path = os.path.join(artifacts_dir, f'normalized_{timestamp}.csv')
-    norm_df[['temp_id', '_text', '_norm']].to_csv(normalized_path, index=False)
+    try:
+        result = run_deduplication(
+            ingested,
+            artifacts_dir,
+            timestamp,
+            remove_stopwords=remove_stopwords,
+            model=model,
+            vector_store=vector_store,
+            annoy_trees=annoy_trees,
+            ann_k=ann_k,
+            cosine_threshold=cosine_threshold,
+            fuzzy_threshold=fuzzy_threshold,
+            nprobe=nprobe,
+            rescore_factor=rescore_factor,
+            pq_subvectors=pq_subvectors,
+        )
+    except InvalidOptionError as e:
+        # Options that depend on the model, e.g. pq_subvectors vs embedding dimension
+        return JSONResponse(status_code=400, content={'error': str(e)})
+    exact_dups, near_dups, cleaned = result['exact_dups'], result['near_dups'], result['cleaned']
+
+    report_path = os.path.join(artifacts_dir, f'report_{timestamp}.json')
+    report = {
+        'timestamp': timestamp,
+        'input_filename': file.filename,
+        'total_records': int(len(df)),
+        'exact_duplicates_removed': int(len(exact_dups)),
+        'near_duplicates_removed': int(len(near_dups)),
+        'final_records': int(len(cleaned)),
+        'deduplication_rate': float((len(df) - len(cleaned)) / max(1, len(df))),
+        'artifacts_dir': artifacts_dir,
+        'files': {
+            'ingested': ingested_path,
+            **result['files'],
+            'report': report_path,
+        }
+    }
+    write_report(report, report_path)
+
+    return report
 
-    origs_after_exact, exact_dups = exact_deduplicate(norm_df, norm_col='_norm')
-    exact_path = os.path.join(artifacts_dir, f'exact_dups_{timestamp}.csv')
-    exact_dups[['temp_id', '_text', '_norm', '_hash']].to_csv(exact_path, index=False)
 
-    embeddings, _ = compute_embeddings(origs_after_exact['_norm'].tolist(), model)
-    index = build_annoy_index(embeddings, num_trees=annoy_trees)
+@app.post("/process_batch")
+async def process_batch(
+    files: List[UploadFile] = File(...),
+    text_column: Optional[str] = Form(None),
+    remove_stopwords: bool = Form(False),
+    model: str = Form("BAAI/bge-small-en-v1.5"),
+    annoy_trees: int = Form(50),
+    ann_k: int = Form(20),
+    cosine_threshold: float = Form(0.9),
+    fuzzy_threshold: int = Form(90),
+    vector_store: str = Form("annoy"),
+    nprobe: int = Form(8),
+    rescore_factor: int = Form(4),
+    pq_subvectors: int = Form(16),
+    arrow_strings: bool = Form(False),
+):
+    # --- LAZY IMPORTS (Load only when needed) ---
+    from undupify.ingest import read_any, prepare_batch_ingestion, write_ingested
+    from undupify.pipeline import InvalidOptionError, run_deduplication, validate_options
+    from undupify.reporting import write_report, source_statistics
+    # --------------------------------------------
 
-    origs_after_near, near_dups = find_near_duplicates(
-        origs_after_exact.reset_index(drop=True),
-        embeddings,
-        index,
-        k=ann_k,
-        cosine_threshold=cosine_threshold,
-        fuzzy_threshold=fuzzy_threshold,
-        norm_col='_norm'
-    )
-    near_path = os.path.join(artifacts_dir, f'near_dups_{timestamp}.csv')
-    near_dups[['temp_id', '_text', '_norm']].to_csv(near_path, index=False)
+    try:
+        validate_options(vector_store, nprobe, rescore_factor, pq_subvectors)
+    except InvalidOptionError as e:
+        return JSONResponse(status_code=400, content={'error': str(e)})
 
-    cleaned_path = os.path.join(artifacts_dir, f'cleaned_{timestamp}.csv')
-    origs_after_near[['temp_id', '_text']].to_csv(cleaned_path, index=False)
+    # Prepare workspace
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    artifacts_dir = os.path.abspath(os.path.join('artifacts', f'batch_{timestamp}'))
+    uploads_dir = os.path.join(artifacts_dir, 'uploads')
+    os.makedirs(uploads_dir, exist_ok=True)
+
+    # Save every upload, keeping source names unique within the batch
+    string_storage = 'pyarrow' if arrow_strings else None
+    sources = []
+    for i, file in enumerate(files, start=1):
+        name = os.path.basename(file.filename or '') or f'upload_{i}'
+        base, ext = os.path.splitext(name)
+        suffix = 1
+        while os.path.exists(os.path.join(uploads_dir, name)):
+            suffix += 1
+            name = f'{base}_{suffix}{ext}'
+        upload_path = os.path.join(uploads_dir, name)
+        with open(upload_path, 'wb') as out:
+            shutil.copyfileobj(file.file, out)
+        sources.append((name, read_any(upload_path, string_storage)))
+
+    # One record stream, one embedding pass and one index for the whole batch
+    ingested, selected_cols = prepare_batch_ingestion(sources, text_column, string_storage)
+    ingested_path = os.path.join(artifacts_dir, f'ingested_{timestamp}.csv')
+    write_ingested(ingested, ingested_path)
 
+    try:
+        result = run_deduplication(
+            ingested,
+            artifacts_dir,
+            timestamp,
+            remove_stopwords=remove_stopwords,
+            model=model,
+            vector_store=vector_store,
+            annoy_trees=annoy_trees,
+            ann_k=ann_k,
+            cosine_threshold=cosine_threshold,
+            fuzzy_threshold=fuzzy_threshold,
+            nprobe=nprobe,
+            rescore_factor=rescore_factor,
+            pq_subvectors=pq_subvectors,
+        )
+    except InvalidOptionError as e:
+        # Options that depend on the model, e.g. pq_subvectors vs embedding dimension
+        return JSONResponse(status_code=400, content={'error': str(e)})
+    exact_dups, near_dups, cleaned = result['exact_dups'], result['near_dups'], result['cleaned']
+
+    total_records = len(ingested)
     report_path = os.path.join(artifacts_dir, f'report_{timestamp}.json')
     report = {
         'timestamp': timestamp,
-        'input_filename': file.filename,
-        'total_records': int(len(df)),
+        'input_filenames': [name for name, _ in sources],
+        'text_columns': selected_cols,
+        'total_records': int(total_records),
         'exact_duplicates_removed': int(len(exact_dups)),
         'near_duplicates_removed': int(len(near_dups)),
-        'final_records': int(len(origs_after_near)),
-        'deduplication_rate': float((len(df) - len(origs_after_near)) / max(1, len(df))),
+        'final_records': int(len(cleaned)),
+        'deduplication_rate': float((total_records - len(cleaned)) / max(1, total_records)),
+        'sources': source_statistics(ingested, exact_dups, near_dups, cleaned, list(selected_cols)),
         'artifacts_dir': artifacts_dir,
         'files': {
             'ingested': ingested_path,
-            'normalized': normalized_path,
-            'exact_dups': exact_path,
-            'near_dups': near_path,
-            'cleaned': cleaned_path,
+            **result['files'],
             'report': report_path,
         }
     }
@@ -1,20 +1,31 @@
 import hashlib
 from typing import Tuple
 
+import numpy as np
 import pandas as pd
 
+from .preprocess import is_arrow_string
+
 
 def _sha256_hex(s: str) -> str:
 	return hashlib.sha256(s.encode('utf-8')).hexdigest()
 
 
 def exact_deduplicate(df: pd.DataFrame, norm_col: str = '_norm') -> Tuple[pd.DataFrame, pd.DataFrame]:
-	work = df.copy()
-	work['_hash'] = work[norm_col].astype(str).apply(_sha256_hex)
+	# Shallow copy: existing columns are shared with `df`, only _hash is new
+	work = df.copy(deep=False)
+	norms = work[norm_col]
+	if is_arrow_string(norms):
+		# Keep hashes in the same Arrow string storage as the text
+		work['_hash'] = pd.Series([_sha256_hex(s) for s in norms.fillna('')], index=work.index, dtype=norms.dtype)
+	else:
+		work['_hash'] = norms.astype(str).apply(_sha256_hex)
 	# Keep first occurrence as original
-	work['_is_exact_dup'] = work.duplicated(subset=['_hash'], keep='first')
-	originals = work[~work['_is_exact_dup']].drop(columns=['_is_exact_dup'])
-	dups = work[work['_is_exact_dup']].drop(columns=['_is_exact_dup'])
+	is_dup = work.duplicated(subset=['_hash'], keep='first').to_numpy()
+	originals = work.take(np.flatnonzero(~is_dup))
+	dups = work.take(np.flatnonzero(is_dup))
+	if 'temp_id' in work.columns:
+		# Record which kept original each duplicate collapses into
+		first_ids = originals.set_index('_hash')['temp_id']
+		dups['_dup_of'] = dups['_hash'].map(first_ids)
 	return originals, dups
-
-
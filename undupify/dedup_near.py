@@ -1,10 +1,12 @@
-from typing import Dict, List, Tuple, Set
+from typing import Dict, List, Tuple, Set, Union
 
 import numpy as np
 import pandas as pd
 from rapidfuzz import fuzz
 from annoy import AnnoyIndex
 
+from .vector_store import QuantizedVectorStore
+
 
 def cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
 	# embeddings are normalized, so cosine = dot
@@ -14,7 +16,7 @@ def cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
 def find_near_duplicates(
 	df: pd.DataFrame,
 	embeddings: np.ndarray,
-	index: AnnoyIndex,
+	index: Union[AnnoyIndex, QuantizedVectorStore],
 	k: int = 20,
 	cosine_threshold: float = 0.9,
 	fuzzy_threshold: int = 90,
@@ -25,6 +27,7 @@ def find_near_duplicates(
 	assigned: Set[int] = set()
 	representative_of: Dict[int, int] = {}
 	order = list(range(n))
+	texts = df[norm_col]
 
 	for i in order:
 		if i in assigned:
@@ -40,7 +43,7 @@ def find_near_duplicates(
 			cos_sim = cosine_similarity(embeddings[i], embeddings[j])
 			if cos_sim < cosine_threshold:
 				continue
-			fuzzy = fuzz.ratio(str(df.iloc[i][norm_col]), str(df.iloc[j][norm_col]))
+			fuzzy = fuzz.ratio(str(texts.iat[i]), str(texts.iat[j]))
 			if fuzzy < fuzzy_threshold:
 				continue
 			representative_of[j] = i
@@ -49,8 +52,12 @@ def find_near_duplicates(
 	# Build outputs
 	indices = list(range(n))
 	is_dup_mask = [idx in representative_of and representative_of[idx] != idx for idx in indices]
-	dups_df = df.iloc[[i for i, dup in enumerate(is_dup_mask) if dup]].copy()
-	origs_df = df.iloc[[i for i, dup in enumerate(is_dup_mask) if not dup]].copy()
+	dup_positions = [i for i, dup in enumerate(is_dup_mask) if dup]
+	dups_df = df.take(dup_positions)
+	if 'temp_id' in df.columns:
+		# Record which kept representative each duplicate collapses into
+		dups_df['_dup_of'] = df['temp_id'].iloc[[representative_of[i] for i in dup_positions]].to_numpy()
+	origs_df = df.take([i for i, dup in enumerate(is_dup_mask) if not dup])
 	return origs_df, dups_df
 
 
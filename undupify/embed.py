@@ -1,4 +1,5 @@
-from typing import List, Tuple, Dict
+import os
+from typing import Iterable, Optional, Tuple, Dict
 
 import numpy as np
 from fastembed import TextEmbedding
@@ -7,11 +8,15 @@ from annoy import AnnoyIndex
 
 _model_cache: Dict[str, TextEmbedding] = {}
 
-def compute_embeddings(texts: List[str], model_name: str) -> Tuple[np.ndarray, int]:
+def _get_model(model_name: str) -> TextEmbedding:
 	if model_name not in _model_cache:
 		# FastEmbed handles model caching internally, but we keep the instance alive
 		_model_cache[model_name] = TextEmbedding(model_name=model_name)
-	model = _model_cache[model_name]
+	return _model_cache[model_name]
+
+
+def compute_embeddings(texts: Iterable[str], model_name: str) -> Tuple[np.ndarray, int]:
+	model = _get_model(model_name)
 	# fastembed.embed returns a generator
 	embeddings_list = list(model.embed(texts))
 	if not embeddings_list:
@@ -21,6 +26,32 @@ def compute_embeddings(texts: List[str], model_name: str) -> Tuple[np.ndarray, i
 	return emb, emb.shape[1]
 
 
+def compute_embeddings_memmap(
+	texts: Iterable[str],
+	model_name: str,
+	output_path: str,
+	count: Optional[int] = None
+) -> Tuple[np.ndarray, int]:
+	"""Stream embeddings into a float32 .npy file and return it memory-mapped.
+
+	`texts` may be any iterable (e.g. a pandas column) so the model pulls them
+	batch by batch; pass `count` when it has no `len()`.
+	"""
+	model = _get_model(model_name)
+	if count is None:
+		count = len(texts)
+	out = None
+	for i, vec in enumerate(model.embed(texts)):
+		if out is None:
+			os.makedirs(os.path.dirname(output_path), exist_ok=True)
+			out = np.lib.format.open_memmap(output_path, mode='w+', dtype=np.float32, shape=(count, len(vec)))
+		out[i] = vec
+	if out is None:
+		raise ValueError("No texts to embed")
+	out.flush()
+	return out, out.shape[1]
+
+
 def build_annoy_index(embeddings: np.ndarray, num_trees: int = 50, metric: str = 'angular') -> AnnoyIndex:
 	dim = embeddings.shape[1]
 	index = AnnoyIndex(dim, metric)
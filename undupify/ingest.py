@@ -1,35 +1,61 @@
+import glob
+import itertools
 import os
-from typing import Optional, Tuple, List
+from typing import Optional, Tuple, List, Dict
 
 import pandas as pd
 
 
-def _read_csv(input_path: str) -> pd.DataFrame:
+_TXT_CHUNK_LINES = 65536
+
+
+def _read_csv(input_path: str, string_storage: Optional[str] = None) -> pd.DataFrame:
+	if string_storage == 'pyarrow':
+		# The pyarrow engine parses straight into Arrow; the C engine would build object arrays first
+		return pd.read_csv(input_path, engine='pyarrow', dtype_backend='pyarrow')
 	return pd.read_csv(input_path)
 
 
-def _read_json(input_path: str) -> pd.DataFrame:
+def _read_json(input_path: str, string_storage: Optional[str] = None) -> pd.DataFrame:
+	kwargs = {'dtype_backend': 'pyarrow'} if string_storage == 'pyarrow' else {}
 	try:
-		return pd.read_json(input_path, lines=True)
+		return pd.read_json(input_path, lines=True, **kwargs)
 	except ValueError:
-		return pd.read_json(input_path)
+		return pd.read_json(input_path, **kwargs)
 
 
-def _read_txt(input_path: str) -> pd.DataFrame:
+def _read_txt(input_path: str, string_storage: Optional[str] = None) -> pd.DataFrame:
 	with open(input_path, 'r', encoding='utf-8', errors='ignore') as f:
-		lines = [line.strip() for line in f]
-	return pd.DataFrame({"text": lines})
-
-
-def read_any(input_path: str) -> pd.DataFrame:
-	"""Read CSV/JSON/TXT into a DataFrame without loss of generality."""
+		if not string_storage:
+			lines = [line.strip() for line in f]
+			return pd.DataFrame({"text": lines})
+		# Convert a bounded chunk of lines at a time rather than one list for the whole file
+		dtype = pd.StringDtype(string_storage)
+		chunks: List[pd.Series] = []
+		while True:
+			lines = [line.strip() for line in itertools.islice(f, _TXT_CHUNK_LINES)]
+			if not lines:
+				break
+			chunks.append(pd.Series(pd.array(lines, dtype=dtype)))
+	text = pd.concat(chunks, ignore_index=True) if chunks else pd.Series(pd.array([], dtype=dtype))
+	return pd.DataFrame({"text": text})
+
+
+def read_any(input_path: str, string_storage: Optional[str] = None) -> pd.DataFrame:
+	"""Read CSV/JSON/TXT into a DataFrame without loss of generality.
+
+	With `string_storage='pyarrow'` CSV is parsed straight into Arrow buffers
+	and TXT is converted in bounded chunks, so no column of Python `str`
+	objects is built for the whole file. JSON is parsed by pandas first and
+	converted afterwards, so its peak memory at read time is unchanged.
+	"""
 	ext = os.path.splitext(input_path)[1].lower()
 	if ext in {'.csv'}:
-		return _read_csv(input_path)
+		return _read_csv(input_path, string_storage)
 	if ext in {'.json', '.jsonl'}:
-		return _read_json(input_path)
+		return _read_json(input_path, string_storage)
 	if ext in {'.txt'}:
-		return _read_txt(input_path)
+		return _read_txt(input_path, string_storage)
 	raise ValueError(f"Unsupported file extension: {ext}")
 
 
@@ -37,7 +63,8 @@ def _candidate_text_columns(df: pd.DataFrame) -> List[str]:
 	text_like = []
 	for col in df.columns:
 		series = df[col]
-		if pd.api.types.is_string_dtype(series):
+		# A column with no rows (e.g. an empty .txt) has nothing to disqualify it
+		if series.empty or pd.api.types.is_string_dtype(series):
 			text_like.append(col)
 		else:
 			# Heuristic: many unique values and convertible to string
@@ -58,16 +85,73 @@ def detect_text_column(df: pd.DataFrame) -> Optional[str]:
 	return candidates[0] if candidates else None
 
 
-def prepare_ingestion(df: pd.DataFrame, text_column: Optional[str]) -> Tuple[pd.DataFrame, str]:
+def prepare_ingestion(
+	df: pd.DataFrame,
+	text_column: Optional[str],
+	string_storage: Optional[str] = None
+) -> Tuple[pd.DataFrame, str]:
+	"""Project the text column into a `temp_id`/`_text` frame.
+
+	`string_storage` ('pyarrow' or 'python') stores `_text` as a pandas
+	StringDtype; later stages keep whatever string dtype they are given.
+	"""
 	col = text_column or detect_text_column(df)
 	if not col:
 		raise ValueError("Could not auto-detect a text column. Please specify --text-column.")
-	work = df.copy()
-	work = work.rename(columns={col: '_text'})
-	# Ensure text is string and handle NaNs
-	work['_text'] = work['_text'].astype(str).fillna('')
+	# Only the text column is converted; the rest of the frame is never copied
+	# Missing cells become '' in both storage modes
+	text = df[col]
+	if string_storage:
+		text = text.astype(pd.StringDtype(string_storage)).fillna('')
+	else:
+		text = text.fillna('').astype(str)
+	work = text.rename('_text').to_frame()
+	work.insert(0, 'temp_id', range(1, len(work) + 1))
+	return work, col
+
+
+def expand_inputs(patterns: List[str]) -> List[str]:
+	"""Expand paths and glob patterns into an ordered list of unique files."""
+	paths: List[str] = []
+	seen = set()
+	for pattern in patterns:
+		matches = sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else [pattern]
+		for path in matches:
+			if os.path.isdir(path):
+				continue
+			key = os.path.abspath(path)
+			if key not in seen:
+				seen.add(key)
+				paths.append(path)
+	return paths
+
+
+def prepare_batch_ingestion(
+	sources: List[Tuple[str, pd.DataFrame]],
+	text_column: Optional[str],
+	string_storage: Optional[str] = None
+) -> Tuple[pd.DataFrame, Dict[str, str]]:
+	"""Ingest several (source name, DataFrame) pairs into one record stream.
+
+	Each record keeps its source name in `_source` and its 1-based position
+	within that source in `_source_row`; `temp_id` is unique across the batch.
+	"""
+	frames: List[pd.DataFrame] = []
+	selected: Dict[str, str] = {}
+	for name, df in sources:
+		if text_column and text_column not in df.columns:
+			raise ValueError(f"{name}: column {text_column!r} not found")
+		ingested, col = prepare_ingestion(df, text_column, string_storage)
+		ingested = ingested.rename(columns={'temp_id': '_source_row'})
+		ingested.insert(0, '_source', name)
+		frames.append(ingested)
+		selected[name] = col
+	if frames:
+		work = pd.concat(frames, ignore_index=True)
+	else:
+		work = pd.DataFrame(columns=['_source', '_source_row', '_text'])
 	work.insert(0, 'temp_id', range(1, len(work) + 1))
-	return work[['temp_id', '_text']], col
+	return work[['temp_id', '_source', '_source_row', '_text']], selected
 
 
 def write_ingested(df: pd.DataFrame, output_path: str) -> None:
@@ -0,0 +1,136 @@
+import os
+from typing import Any, Callable, Dict, Optional
+
+import pandas as pd
+
+from .preprocess import normalize_dataframe
+from .dedup_exact import exact_deduplicate
+from .embed import compute_embeddings, compute_embeddings_memmap, build_annoy_index
+from .vector_store import build_quantized_store
+from .dedup_near import find_near_duplicates
+
+
+VECTOR_STORES = ('annoy', 'int8', 'pq')
+
+
+class InvalidOptionError(ValueError):
+	"""A pipeline option is out of range; raised before the expensive stages."""
+
+
+def validate_options(
+	vector_store: str = 'annoy',
+	nprobe: int = 8,
+	rescore_factor: int = 4,
+	pq_subvectors: int = 16
+) -> None:
+	if vector_store not in VECTOR_STORES:
+		raise InvalidOptionError(f"vector_store must be one of {', '.join(VECTOR_STORES)}")
+	for name, value in (('nprobe', nprobe), ('rescore_factor', rescore_factor), ('pq_subvectors', pq_subvectors)):
+		if value < 1:
+			raise InvalidOptionError(f"{name} must be at least 1")
+
+
+def run_deduplication(
+	ingested: pd.DataFrame,
+	artifacts_dir: str,
+	timestamp: str,
+	remove_stopwords: bool = False,
+	model: str = 'sentence-transformers/all-MiniLM-L6-v2',
+	vector_store: str = 'annoy',
+	annoy_trees: int = 50,
+	ann_k: int = 20,
+	cosine_threshold: float = 0.9,
+	fuzzy_threshold: int = 90,
+	nprobe: int = 8,
+	rescore_factor: int = 4,
+	pq_subvectors: int = 16,
+	log: Optional[Callable[[str], None]] = None
+) -> Dict[str, Any]:
+	"""Normalize, drop exact then near duplicates, and write the CSV artifacts.
+
+	`ingested` comes from `prepare_ingestion` or `prepare_batch_ingestion`; batch
+	frames keep their `_source`/`_source_row`/`_dup_of` columns in the artifacts.
+	Returns the `exact_dups`, `near_dups` and `cleaned` frames plus the written
+	`files`.
+	"""
+	validate_options(vector_store, nprobe, rescore_factor, pq_subvectors)
+	log = log or (lambda msg: None)
+	# Batch runs carry source provenance through every artifact
+	is_batch = '_source' in ingested.columns
+	id_cols = ['temp_id', '_source', '_source_row'] if is_batch else ['temp_id']
+	dup_cols = ['_dup_of'] if is_batch else []
+
+	log('Normalizing text...')
+	norm_df = normalize_dataframe(ingested, text_col='_text', output_col='_norm', remove_stopwords=remove_stopwords)
+	normalized_path = os.path.join(artifacts_dir, f'normalized_{timestamp}.csv')
+	norm_df[id_cols + ['_text', '_norm']].to_csv(normalized_path, index=False)
+	log(f'Wrote normalized dataset to {normalized_path}')
+
+	log('Exact duplicate filtering (hashing)...')
+	origs_after_exact, exact_dups = exact_deduplicate(norm_df, norm_col='_norm')
+	log(f'Exact duplicates: {len(exact_dups)}')
+
+	log('Computing embeddings for remaining records...')
+	# Feed the model from the column iterator instead of a list of every text
+	norms = origs_after_exact['_norm']
+	if vector_store == 'annoy':
+		embeddings, _ = compute_embeddings(iter(norms), model)
+		index = build_annoy_index(embeddings, num_trees=annoy_trees)
+	else:
+		# Float vectors stay on disk; only the compact codes are held in RAM
+		if vector_store == 'pq' and len(origs_after_exact):
+			# Embed one text to learn the dimension before committing to the full pass
+			_, dim = compute_embeddings(norms.iloc[:1].tolist(), model)
+			if dim % pq_subvectors:
+				raise InvalidOptionError(f"Embedding dimension {dim} of {model} is not divisible by pq_subvectors={pq_subvectors}")
+		embeddings_path = os.path.join(artifacts_dir, f'embeddings_{timestamp}.npy')
+		compute_embeddings_memmap(iter(norms), model, embeddings_path, count=len(norms))
+		index = build_quantized_store(
+			embeddings_path,
+			quantization=vector_store,
+			nprobe=nprobe,
+			rescore_factor=rescore_factor,
+			pq_subvectors=pq_subvectors
+		)
+		embeddings = index.vectors
+
+	log('Near-duplicate detection (ANN + cosine + edit distance)...')
+	origs_after_near, near_dups = find_near_duplicates(
+		origs_after_exact,
+		embeddings,
+		index,
+		k=ann_k,
+		cosine_threshold=cosine_threshold,
+		fuzzy_threshold=fuzzy_threshold,
+		norm_col='_norm'
+	)
+	if '_dup_of' in exact_dups.columns and '_dup_of' in near_dups.columns:
+		# An exact duplicate's original may itself be a near duplicate; point it at
+		# the record that is finally kept (near representatives are never dropped)
+		kept_as = exact_dups['_dup_of'].map(near_dups.set_index('temp_id')['_dup_of'])
+		exact_dups['_dup_of'] = kept_as.where(kept_as.notna(), exact_dups['_dup_of']).astype(exact_dups['_dup_of'].dtype)
+	exact_path = os.path.join(artifacts_dir, f'exact_dups_{timestamp}.csv')
+	exact_dups[id_cols + ['_text', '_norm', '_hash'] + dup_cols].to_csv(exact_path, index=False)
+	log(f'Wrote exact duplicates to {exact_path}')
+
+	near_path = os.path.join(artifacts_dir, f'near_dups_{timestamp}.csv')
+	near_dups[id_cols + ['_text', '_norm'] + dup_cols].to_csv(near_path, index=False)
+	log(f'Near duplicates: {len(near_dups)} (saved to {near_path})')
+
+	cleaned_path = os.path.join(artifacts_dir, f'cleaned_{timestamp}.csv')
+	origs_after_near[id_cols + ['_text']].to_csv(cleaned_path, index=False)
+
+	files = {
+		'normalized': normalized_path,
+		'exact_dups': exact_path,
+		'near_dups': near_path,
+		'cleaned': cleaned_path,
+	}
+	if vector_store != 'annoy':
+		files['embeddings'] = embeddings_path
+	return {
+		'exact_dups': exact_dups,
+		'near_dups': near_dups,
+		'cleaned': origs_after_near,
+		'files': files
+	}
@@ -6,6 +6,7 @@ import pandas as pd
 
 _WHITESPACE_RE = re.compile(r"\s+")
 _NON_ALNUM_RE = re.compile(r"[^a-z0-9\s]")
+_NON_ASCII_RE = re.compile(r"[^\x00-\x7f]")
 
 # Lightweight built-in English stopword list to avoid external deps
 _EN_STOPWORDS = {
@@ -23,6 +24,18 @@ _EN_STOPWORDS = {
 }
 
 
+def is_arrow_string(series: pd.Series) -> bool:
+	"""True when `series` holds Arrow-backed strings rather than Python objects."""
+	dtype = series.dtype
+	if isinstance(dtype, pd.StringDtype):
+		return dtype.storage.startswith('pyarrow')
+	return isinstance(dtype, pd.ArrowDtype) and pd.api.types.is_string_dtype(dtype)
+
+
+def _remove_stopwords(s: str) -> str:
+	return ' '.join(w for w in s.split(' ') if w and w not in _EN_STOPWORDS)
+
+
 def normalize_text(text: str, remove_stopwords: bool = False) -> str:
 	if text is None:
 		return ''
@@ -33,14 +46,31 @@ def normalize_text(text: str, remove_stopwords: bool = False) -> str:
 	# Whitespace collapse
 	s = _WHITESPACE_RE.sub(' ', s).strip()
 	if remove_stopwords:
-		words = [w for w in s.split(' ') if w and w not in _EN_STOPWORDS]
-		s = ' '.join(words)
+		s = _remove_stopwords(s)
 	return s
 
 
-def normalize_dataframe(df: pd.DataFrame, text_col: str = '_text', output_col: str = '_norm', remove_stopwords: bool = False) -> pd.DataFrame:
-	work = df.copy()
-	work[output_col] = work[text_col].astype(str).apply(lambda x: normalize_text(x, remove_stopwords=remove_stopwords))
-	return work
+def _normalize_arrow(text: pd.Series, remove_stopwords: bool = False) -> pd.Series:
+	# Same steps as normalize_text, run as Arrow compute kernels over the whole column
+	text = text.fillna('')
+	s = text.str.lower()
+	s = s.str.replace(_NON_ALNUM_RE.pattern, ' ', regex=True)
+	s = s.str.replace(_WHITESPACE_RE.pattern, ' ', regex=True).str.strip()
+	# Arrow's utf8_lower differs from str.lower on some letters (e.g. 'İ'), so
+	# non-ASCII rows go through normalize_text to keep _norm/_hash identical
+	non_ascii = text.str.contains(_NON_ASCII_RE.pattern, regex=True).to_numpy(dtype=bool)
+	if non_ascii.any():
+		s[non_ascii] = [normalize_text(x) for x in text[non_ascii]]
+	if remove_stopwords:
+		s = s.map(_remove_stopwords).astype(text.dtype)
+	return s
 
 
+def normalize_dataframe(df: pd.DataFrame, text_col: str = '_text', output_col: str = '_norm', remove_stopwords: bool = False) -> pd.DataFrame:
+	# Shallow copy: existing columns are shared with `df`, only output_col is new
+	work = df.copy(deep=False)
+	if is_arrow_string(work[text_col]):
+		work[output_col] = _normalize_arrow(work[text_col], remove_stopwords=remove_stopwords)
+	else:
+		work[output_col] = work[text_col].astype(str).apply(lambda x: normalize_text(x, remove_stopwords=remove_stopwords))
+	return work
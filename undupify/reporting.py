@@ -1,6 +1,8 @@
 import json
 import os
-from typing import Dict
+from typing import Dict, List, Optional
+
+import pandas as pd
 
 
 def write_report(report: Dict, output_path: str) -> None:
@@ -9,3 +11,47 @@ def write_report(report: Dict, output_path: str) -> None:
 		json.dump(report, f, indent=2, ensure_ascii=False)
 
 
+def source_statistics(
+	ingested: pd.DataFrame,
+	exact_dups: pd.DataFrame,
+	near_dups: pd.DataFrame,
+	cleaned: pd.DataFrame,
+	source_names: Optional[List[str]] = None,
+	source_col: str = '_source'
+) -> Dict[str, Dict]:
+	"""Per-source counts for a batch run.
+
+	`source_names` lists every input of the batch, so sources that yielded no
+	records still get an entry; it defaults to the sources seen in `ingested`.
+	A duplicate counts as cross-source when the record it collapsed into
+	(`_dup_of`) came from a different source.
+	"""
+	source_of = ingested.set_index('temp_id')[source_col]
+	totals = ingested[source_col].value_counts()
+	exact_counts = exact_dups[source_col].value_counts()
+	near_counts = near_dups[source_col].value_counts()
+	final_counts = cleaned[source_col].value_counts()
+
+	cross_counts: Dict[str, int] = {}
+	for dups in (exact_dups, near_dups):
+		if '_dup_of' not in dups.columns or dups.empty:
+			continue
+		is_cross = dups['_dup_of'].map(source_of) != dups[source_col]
+		for name, count in dups.loc[is_cross, source_col].value_counts().items():
+			cross_counts[name] = cross_counts.get(name, 0) + int(count)
+
+	stats: Dict[str, Dict] = {}
+	if source_names is None:
+		source_names = ingested[source_col].drop_duplicates().tolist()
+	for name in source_names:
+		total = int(totals.get(name, 0))
+		final = int(final_counts.get(name, 0))
+		stats[name] = {
+			'total_records': total,
+			'exact_duplicates_removed': int(exact_counts.get(name, 0)),
+			'near_duplicates_removed': int(near_counts.get(name, 0)),
+			'cross_source_duplicates_removed': cross_counts.get(name, 0),
+			'final_records': final,
+			'deduplication_rate': float((total - final) / max(1, total)),
+		}
+	return stats
@@ -0,0 +1,228 @@
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+
+
+_CHUNK_ROWS = 65536
+# Upper bound for one rows x centroids distance block
+_BLOCK_BYTES = 64 * 1024 * 1024
+# k-means needs ~39 training points per centroid to place it reliably
+_MIN_POINTS_PER_LIST = 39
+
+
+def _block_rows(width: int) -> int:
+	return max(1, _BLOCK_BYTES // (4 * max(1, width)))
+
+
+def _nearest_centroids(data: np.ndarray, centroids: np.ndarray, n: int = 1) -> np.ndarray:
+	sq_norms = (centroids * centroids).sum(axis=1)[None, :]
+	out = np.empty((data.shape[0], n), dtype=np.int64)
+	step = _block_rows(centroids.shape[0])
+	for start in range(0, data.shape[0], step):
+		block = data[start:start + step]
+		# Squared L2 without the constant ||x||^2 term
+		dists = sq_norms - 2.0 * (block @ centroids.T)
+		if n == 1:
+			out[start:start + step, 0] = dists.argmin(axis=1)
+			continue
+		part = np.argpartition(dists, n - 1, axis=1)[:, :n]
+		order = np.take_along_axis(dists, part, axis=1).argsort(axis=1)
+		out[start:start + step] = np.take_along_axis(part, order, axis=1)
+	return out
+
+
+def _kmeans(data: np.ndarray, k: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+	rng = np.random.default_rng(seed)
+	data = np.asarray(data, dtype=np.float32)
+	k = min(k, data.shape[0])
+	centroids = data[rng.choice(data.shape[0], k, replace=False)].copy()
+	for _ in range(iterations):
+		assign = _nearest_centroids(data, centroids)[:, 0]
+		sums = np.zeros_like(centroids)
+		np.add.at(sums, assign, data)
+		counts = np.bincount(assign, minlength=k)
+		# Empty clusters keep their previous centroid
+		filled = counts > 0
+		centroids[filled] = sums[filled] / counts[filled, None]
+	return centroids
+
+
+def _training_sample(vectors: np.ndarray, train_size: int, seed: int) -> np.ndarray:
+	n = vectors.shape[0]
+	if n <= train_size:
+		return np.asarray(vectors, dtype=np.float32)
+	rows = np.sort(np.random.default_rng(seed).choice(n, train_size, replace=False))
+	return np.asarray(vectors[rows], dtype=np.float32)
+
+
+class QuantizedVectorStore:
+	"""Compact ANN store: int8 or product-quantized codes, exact float rescoring.
+
+	Vectors are bucketed into inverted lists around coarse centroids. A query
+	probes the `nprobe` closest lists, ranks candidates on the compact codes and
+	rescores only the best `rescore_factor * n` of them against the float32
+	vectors, which are read lazily from a memory-mapped .npy file.
+
+	Exposes `get_nns_by_item` like an angular `AnnoyIndex` (nearest first,
+	distances are sqrt(2 - 2*cos)), so it can be passed straight to
+	`find_near_duplicates` together with `store.vectors`.
+	"""
+
+	def __init__(
+		self,
+		vectors_path: str,
+		quantization: str,
+		codes: np.ndarray,
+		scales: Optional[np.ndarray],
+		codebooks: Optional[np.ndarray],
+		coarse_centroids: np.ndarray,
+		list_offsets: np.ndarray,
+		list_ids: np.ndarray,
+		nprobe: int = 8,
+		rescore_factor: int = 4
+	):
+		self.vectors_path = vectors_path
+		self.quantization = quantization
+		self.codes = codes
+		self.scales = scales
+		self.codebooks = codebooks
+		self.coarse_centroids = coarse_centroids
+		self.list_offsets = list_offsets
+		self.list_ids = list_ids
+		self.nprobe = nprobe
+		self.rescore_factor = rescore_factor
+		self._vectors: Optional[np.ndarray] = None
+
+	@property
+	def vectors(self) -> np.ndarray:
+		"""Full-precision vectors, memory-mapped on first access."""
+		if self._vectors is None:
+			self._vectors = np.load(self.vectors_path, mmap_mode='r')
+		return self._vectors
+
+	def get_n_items(self) -> int:
+		return int(self.codes.shape[0])
+
+	def _candidates(self, query: np.ndarray) -> np.ndarray:
+		nprobe = min(self.nprobe, self.coarse_centroids.shape[0])
+		probes = _nearest_centroids(query[None, :], self.coarse_centroids, nprobe)[0]
+		parts = [self.list_ids[self.list_offsets[c]:self.list_offsets[c + 1]] for c in probes]
+		return np.concatenate(parts) if parts else np.empty(0, dtype=self.list_ids.dtype)
+
+	def _approx_scores(self, query: np.ndarray, ids: np.ndarray) -> np.ndarray:
+		if self.quantization == 'pq':
+			m, _, sub_dim = self.codebooks.shape
+			# Asymmetric distance: per-subspace lookup tables against the float query
+			tables = np.einsum('mks,ms->mk', self.codebooks, query.reshape(m, sub_dim))
+			return tables[np.arange(m), self.codes[ids]].sum(axis=1)
+		return (self.codes[ids].astype(np.float32) @ query) * self.scales[ids]
+
+	def get_nns_by_vector(
+		self,
+		vector: np.ndarray,
+		n: int,
+		include_distances: bool = False
+	) -> Union[List[int], Tuple[List[int], List[float]]]:
+		query = np.asarray(vector, dtype=np.float32)
+		ids = self._candidates(query)
+		if ids.size == 0:
+			return ([], []) if include_distances else []
+		shortlist = max(n, n * self.rescore_factor)
+		if ids.size > shortlist:
+			approx = self._approx_scores(query, ids)
+			ids = ids[np.argpartition(-approx, shortlist - 1)[:shortlist]]
+		# Sorted row order keeps memmap reads sequential
+		ids = np.sort(ids)
+		exact = np.asarray(self.vectors[ids], dtype=np.float32) @ query
+		top = np.argsort(-exact, kind='stable')[:n]
+		result = ids[top].tolist()
+		if include_distances:
+			# Angular distance, as reported by AnnoyIndex(dim, 'angular')
+			return result, np.sqrt(np.maximum(0.0, 2.0 - 2.0 * exact[top])).tolist()
+		return result
+
+	def get_nns_by_item(
+		self,
+		i: int,
+		n: int,
+		include_distances: bool = False
+	) -> Union[List[int], Tuple[List[int], List[float]]]:
+		return self.get_nns_by_vector(self.vectors[i], n, include_distances=include_distances)
+
+
+def build_quantized_store(
+	vectors_path: str,
+	quantization: str = 'int8',
+	nlist: Optional[int] = None,
+	nprobe: int = 8,
+	rescore_factor: int = 4,
+	pq_subvectors: int = 16,
+	train_size: int = 100000,
+	seed: int = 0
+) -> QuantizedVectorStore:
+	"""Quantize the float32 .npy matrix at `vectors_path` in chunks.
+
+	`quantization` is 'int8' (one int8 code per dimension plus a per-vector
+	scale) or 'pq' (`pq_subvectors` uint8 codes per vector). `nlist` defaults
+	to roughly 4*sqrt(n) inverted lists, capped so that `train_size` holds
+	enough points per list; small inputs use a single list. An explicit
+	`nlist` raises `train_size` instead.
+	"""
+	if quantization not in {'int8', 'pq'}:
+		raise ValueError(f"Unsupported quantization: {quantization}")
+	vectors = np.load(vectors_path, mmap_mode='r')
+	n, dim = vectors.shape
+	if nlist is None:
+		nlist = 1 if n < 4096 else min(int(4 * np.sqrt(n)), train_size // _MIN_POINTS_PER_LIST)
+	nlist = max(1, min(nlist, n))
+	train_size = max(train_size, _MIN_POINTS_PER_LIST * nlist)
+
+	sample = _training_sample(vectors, train_size, seed)
+	coarse = _kmeans(sample, nlist, seed=seed) if nlist > 1 else sample.mean(axis=0, keepdims=True)
+
+	codebooks = None
+	scales = None
+	if quantization == 'pq':
+		if dim % pq_subvectors:
+			raise ValueError(f"Embedding dimension {dim} is not divisible by pq_subvectors={pq_subvectors}")
+		sub_dim = dim // pq_subvectors
+		ks = min(256, sample.shape[0])
+		codebooks = np.zeros((pq_subvectors, ks, sub_dim), dtype=np.float32)
+		for j in range(pq_subvectors):
+			codebooks[j] = _kmeans(sample[:, j * sub_dim:(j + 1) * sub_dim], ks, seed=seed + j)
+		codes = np.empty((n, pq_subvectors), dtype=np.uint8)
+	else:
+		codes = np.empty((n, dim), dtype=np.int8)
+		scales = np.empty(n, dtype=np.float32)
+
+	assign = np.empty(n, dtype=np.int64)
+	# Smaller chunks when there are many lists keep the distance block bounded
+	chunk_rows = min(_CHUNK_ROWS, _block_rows(max(coarse.shape[0], dim)))
+	for start in range(0, n, chunk_rows):
+		stop = min(start + chunk_rows, n)
+		chunk = np.asarray(vectors[start:stop], dtype=np.float32)
+		assign[start:stop] = _nearest_centroids(chunk, coarse)[:, 0]
+		if quantization == 'pq':
+			for j in range(pq_subvectors):
+				sub = chunk[:, j * sub_dim:(j + 1) * sub_dim]
+				codes[start:stop, j] = _nearest_centroids(sub, codebooks[j])[:, 0]
+		else:
+			chunk_scales = np.abs(chunk).max(axis=1) / 127.0
+			chunk_scales[chunk_scales == 0] = 1.0
+			scales[start:stop] = chunk_scales
+			codes[start:stop] = np.clip(np.rint(chunk / chunk_scales[:, None]), -127, 127)
+
+	list_ids = np.argsort(assign, kind='stable')
+	list_offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=coarse.shape[0]))])
+	return QuantizedVectorStore(
+		vectors_path,
+		quantization,
+		codes,
+		scales,
+		codebooks,
+		coarse,
+		list_offsets,
+		list_ids,
+		nprobe=nprobe,
+		rescore_factor=rescore_factor
+	)